@@ -18,6 +18,7 @@
 
 import os
 import json
+import tempfile
 import logging
 
 import bpy
@@ -31,12 +32,24 @@ from bpy.props import (
 
 from . import constants
 
+try:
+    import msgpack
+    _HAS_MSGPACK = True
+except ImportError:
+    _HAS_MSGPACK = False
+
 logging.basicConfig(
     format='%(levelname)s:THREE:%(message)s',
     level=logging.DEBUG)
 
 SETTINGS_FILE_EXPORT = 'three_settings_export.js'
 
+# resolved lazily by get_settings_fullpath()
+_settings_path = None
+
+# last settings payload written to disk, used to skip redundant writes
+_last_settings_payload = None
+
 
 bl_info = {
     'name': "Three.js Format",
@@ -52,25 +65,16 @@ bl_info = {
     'category': 'Import-Export'
 }
 
-def _geometry_types():
-    """The valid geometry types that are supported by Three.js
-
-    :return: list of tuples
-
-    """
-    keys = (constants.GLOBAL,
-            constants.GEOMETRY,
-            constants.BUFFER_GEOMETRY)
-    types = []
-    for key in keys:
-        types.append((key, key.title(), key))
-
-    return types
+# The valid geometry types that are supported by Three.js
+_GEOMETRY_TYPES = tuple((key, key.title(), key) for key in (
+    constants.GLOBAL,
+    constants.GEOMETRY,
+    constants.BUFFER_GEOMETRY))
 
 bpy.types.Mesh.THREE_geometry_type = EnumProperty(
     name="Geometry type",
     description="Geometry type",
-    items=_geometry_types(),
+    items=_GEOMETRY_TYPES,
     default=constants.GLOBAL)
 
 class ThreeMesh(bpy.types.Panel):
@@ -93,26 +97,19 @@ class ThreeMesh(bpy.types.Panel):
                      'THREE_geometry_type',
                      text="Type")
 
-def _blending_types(index):
-    """Supported blending types for Three.js
-
-    :param index:
-    :type index: int
-    :returns: tuple if types (str, str, str)
-
-    """
-    types = (constants.BLENDING_TYPES.NONE,
-             constants.BLENDING_TYPES.NORMAL,
-             constants.BLENDING_TYPES.ADDITIVE,
-             constants.BLENDING_TYPES.SUBTRACTIVE,
-             constants.BLENDING_TYPES.MULTIPLY,
-             constants.BLENDING_TYPES.CUSTOM)
-    return (types[index], types[index], types[index])
+# Supported blending types for Three.js
+# (CUSTOM blending is not exposed)
+_BLENDING_ITEMS = tuple((key, key, key) for key in (
+    constants.BLENDING_TYPES.NONE,
+    constants.BLENDING_TYPES.NORMAL,
+    constants.BLENDING_TYPES.ADDITIVE,
+    constants.BLENDING_TYPES.SUBTRACTIVE,
+    constants.BLENDING_TYPES.MULTIPLY))
 
 bpy.types.Material.THREE_blending_type = EnumProperty(
     name="Blending type",
     description="Blending type",
-    items=[_blending_types(x) for x in range(5)],
+    items=_BLENDING_ITEMS,
     default=constants.BLENDING_TYPES.NORMAL)
 
 bpy.types.Material.THREE_depth_write = BoolProperty(default=True)
@@ -151,61 +148,40 @@ class ThreeMaterial(bpy.types.Panel):
             row.prop(mat, 'THREE_depth_test',
                      text="Enable depth testing")
 
-def _mag_filters(index):
-    """Three.js mag filters
-
-    :param index:
-    :type index: int
-    :returns: tuple with the filter values
-
-    """
-    types = (constants.LINEAR_FILTERS.LINEAR,
-             constants.NEAREST_FILTERS.NEAREST)
-    return (types[index], types[index], types[index])
+# Three.js mag filters
+_MAG_FILTER_ITEMS = tuple((key, key, key) for key in (
+    constants.LINEAR_FILTERS.LINEAR,
+    constants.NEAREST_FILTERS.NEAREST))
 
 bpy.types.Texture.THREE_mag_filter = EnumProperty(
     name="Mag Filter",
-    items=[_mag_filters(x) for x in range(2)],
+    items=_MAG_FILTER_ITEMS,
     default=constants.LINEAR_FILTERS.LINEAR)
 
-def _min_filters(index):
-    """Three.js min filters
-
-    :param index:
-    :type index: int
-    :returns: tuple with the filter values
-
-    """
-    types = (constants.LINEAR_FILTERS.LINEAR,
-             constants.LINEAR_FILTERS.MIP_MAP_NEAREST,
-             constants.LINEAR_FILTERS.MIP_MAP_LINEAR,
-             constants.NEAREST_FILTERS.NEAREST,
-             constants.NEAREST_FILTERS.MIP_MAP_NEAREST,
-             constants.NEAREST_FILTERS.MIP_MAP_LINEAR)
-    return (types[index], types[index], types[index])
+# Three.js min filters
+_MIN_FILTER_ITEMS = tuple((key, key, key) for key in (
+    constants.LINEAR_FILTERS.LINEAR,
+    constants.LINEAR_FILTERS.MIP_MAP_NEAREST,
+    constants.LINEAR_FILTERS.MIP_MAP_LINEAR,
+    constants.NEAREST_FILTERS.NEAREST,
+    constants.NEAREST_FILTERS.MIP_MAP_NEAREST,
+    constants.NEAREST_FILTERS.MIP_MAP_LINEAR))
 
 bpy.types.Texture.THREE_min_filter = EnumProperty(
     name="Min Filter",
-    items=[_min_filters(x) for x in range(6)],
+    items=_MIN_FILTER_ITEMS,
     default=constants.LINEAR_FILTERS.MIP_MAP_LINEAR)
 
-def _mapping(index):
-    """Three.js texture mappings types
-
-    :param index:
-    :type index: int
-    :returns: tuple with the mapping values
-
-    """
-    types = (constants.MAPPING_TYPES.UV,
-             constants.MAPPING_TYPES.CUBE_REFLECTION,
-             constants.MAPPING_TYPES.CUBE_REFRACTION,
-             constants.MAPPING_TYPES.SPHERICAL_REFLECTION)
-    return (types[index], types[index], types[index])
+# Three.js texture mappings types
+_MAPPING_ITEMS = tuple((key, key, key) for key in (
+    constants.MAPPING_TYPES.UV,
+    constants.MAPPING_TYPES.CUBE_REFLECTION,
+    constants.MAPPING_TYPES.CUBE_REFRACTION,
+    constants.MAPPING_TYPES.SPHERICAL_REFLECTION))
 
 bpy.types.Texture.THREE_mapping = EnumProperty(
     name="Mapping",
-    items=[_mapping(x) for x in range(4)],
+    items=_MAPPING_ITEMS,
     default=constants.MAPPING_TYPES.UV)
 
 class ThreeTexture(bpy.types.Panel):
@@ -262,7 +238,67 @@ def get_settings_fullpath():
     :returns: Full path to the settings file (temp directory)
 
     """
-    return os.path.join(bpy.app.tempdir, SETTINGS_FILE_EXPORT)
+    global _settings_path
+
+    # the temp directory does not change for the life of the session
+    if _settings_path is None:
+        _settings_path = os.path.join(bpy.app.tempdir, SETTINGS_FILE_EXPORT)
+
+    return _settings_path
+
+
+# Maps each export setting key to the ExportThree property holding it
+_SETTINGS_MAP = (
+    ## Geometry {
+    (constants.VERTICES, 'option_vertices'),
+    (constants.FACES, 'option_faces'),
+    (constants.NORMALS, 'option_normals'),
+    (constants.SKINNING, 'option_skinning'),
+    (constants.BONES, 'option_bones'),
+    (constants.INFLUENCES_PER_VERTEX, 'option_influences'),
+    (constants.GEOMETRY_TYPE, 'option_geometry_type'),
+    ## }
+
+    ## Materials {
+    (constants.MATERIALS, 'option_materials'),
+    (constants.UVS, 'option_uv_coords'),
+    (constants.FACE_MATERIALS, 'option_face_materials'),
+    (constants.MAPS, 'option_maps'),
+    (constants.COLORS, 'option_colors'),
+    (constants.MIX_COLORS, 'option_mix_colors'),
+    ## }
+
+    ## Settings {
+    (constants.SCALE, 'option_scale'),
+    (constants.ENABLE_PRECISION, 'option_round_off'),
+    (constants.PRECISION, 'option_round_value'),
+    (constants.LOGGING, 'option_logging'),
+    (constants.COMPRESSION, 'option_compression'),
+    (constants.INDENT, 'option_indent'),
+    (constants.COPY_TEXTURES, 'option_copy_textures'),
+    (constants.EMBED_ANIMATION, 'option_embed_animation'),
+    ## }
+
+    ## Scene {
+    (constants.SCENE, 'option_export_scene'),
+    #(constants.EMBED_GEOMETRY, 'option_embed_geometry'),
+    (constants.LIGHTS, 'option_lights'),
+    (constants.CAMERAS, 'option_cameras'),
+    ## }
+
+    ## Animation {
+    (constants.MORPH_TARGETS, 'option_animation_morph'),
+    (constants.ANIMATION, 'option_animation_skeletal'),
+    (constants.FRAME_STEP, 'option_frame_step'),
+    (constants.FRAME_INDEX_AS_TIME, 'option_frame_index_as_time')
+    ## }
+)
+
+# Defaults used when a setting is missing from the settings file.
+# EXPORT_OPTIONS has no compression (None) which is not a valid
+# enum value for the property.
+_SETTINGS_DEFAULTS = dict(constants.EXPORT_OPTIONS)
+_SETTINGS_DEFAULTS[constants.COMPRESSION] = constants.NONE
 
 
 def save_settings_export(properties):
@@ -273,46 +309,33 @@ def save_settings_export(properties):
     :rtype: dict
 
     """
-    settings = {
-        constants.VERTICES: properties.option_vertices,
-        constants.FACES: properties.option_faces,
-        constants.NORMALS: properties.option_normals,
-        constants.SKINNING: properties.option_skinning,
-        constants.BONES: properties.option_bones,
-        constants.GEOMETRY_TYPE: properties.option_geometry_type,
-
-        constants.MATERIALS: properties.option_materials,
-        constants.UVS: properties.option_uv_coords,
-        constants.FACE_MATERIALS: properties.option_face_materials,
-        constants.MAPS: properties.option_maps,
-        constants.COLORS: properties.option_colors,
-        constants.MIX_COLORS: properties.option_mix_colors,
-
-        constants.SCALE: properties.option_scale,
-        constants.ENABLE_PRECISION: properties.option_round_off,
-        constants.PRECISION: properties.option_round_value,
-        constants.LOGGING: properties.option_logging,
-        constants.COMPRESSION: properties.option_compression,
-        constants.INDENT: properties.option_indent,
-        constants.COPY_TEXTURES: properties.option_copy_textures,
-
-        constants.SCENE: properties.option_export_scene,
-        #constants.EMBED_GEOMETRY: properties.option_embed_geometry,
-        constants.EMBED_ANIMATION: properties.option_embed_animation,
-        constants.LIGHTS: properties.option_lights,
-        constants.CAMERAS: properties.option_cameras,
-
-        constants.MORPH_TARGETS: properties.option_animation_morph,
-        constants.ANIMATION: properties.option_animation_skeletal,
-        constants.FRAME_STEP: properties.option_frame_step,
-        constants.FRAME_INDEX_AS_TIME: properties.option_frame_index_as_time,
-        constants.INFLUENCES_PER_VERTEX: properties.option_influences
-    }
+    global _last_settings_payload
+
+    settings = {key: getattr(properties, attr)
+                for key, attr in _SETTINGS_MAP}
+
+    # serialize up front so the file is written in one call
+    payload = json.dumps(settings, separators=(',', ':')).encode('utf-8')
+    if payload == _last_settings_payload:
+        logging.debug("Settings unchanged, skipping save")
+        return settings
 
     fname = get_settings_fullpath()
     logging.debug("Saving settings to %s", fname)
-    with open(fname, 'w') as stream:
-        json.dump(settings, stream)
+
+    # write to a temp file and swap it in so a crash mid-write
+    # never leaves a truncated settings file behind
+    stream = tempfile.NamedTemporaryFile(
+        dir=os.path.dirname(fname), delete=False)
+    try:
+        with stream:
+            stream.write(payload)
+        os.replace(stream.name, fname)
+    except OSError:
+        os.remove(stream.name)
+        raise
+
+    _last_settings_payload = payload
 
     return settings
 
@@ -326,140 +349,32 @@ def restore_settings_export(properties):
 
     """
 
-    settings = {}
+    defaults = _SETTINGS_DEFAULTS
 
     fname = get_settings_fullpath()
-    if os.path.exists(fname) and os.access(fname, os.R_OK):
-        logging.debug("Settings cache found %s", fname)
-        with open(fname, 'r') as fs:
-            settings = json.load(fs)
-    else:
+    try:
+        with open(fname, 'rb') as fs:
+            payload = fs.read()
+    except OSError:
         logging.debug("No settings file found, using defaults.")
+        for key, attr in _SETTINGS_MAP:
+            setattr(properties, attr, defaults[key])
+        return
 
-    ## Geometry {
-    properties.option_vertices = settings.get(
-        constants.VERTICES,
-        constants.EXPORT_OPTIONS[constants.VERTICES])
-
-    properties.option_faces = settings.get(
-        constants.FACES,
-        constants.EXPORT_OPTIONS[constants.FACES])
-    properties.option_normals = settings.get(
-        constants.NORMALS,
-        constants.EXPORT_OPTIONS[constants.NORMALS])
-
-    properties.option_skinning = settings.get(
-        constants.SKINNING,
-        constants.EXPORT_OPTIONS[constants.SKINNING])
-
-    properties.option_bones = settings.get(
-        constants.BONES,
-        constants.EXPORT_OPTIONS[constants.BONES])
-
-    properties.option_influences = settings.get(
-        constants.INFLUENCES_PER_VERTEX,
-        constants.EXPORT_OPTIONS[constants.INFLUENCES_PER_VERTEX])
-
-    properties.option_geometry_type = settings.get(
-        constants.GEOMETRY_TYPE,
-        constants.EXPORT_OPTIONS[constants.GEOMETRY_TYPE])
-    ## }
-
-    ## Materials {
-    properties.option_materials = settings.get(
-        constants.MATERIALS,
-        constants.EXPORT_OPTIONS[constants.MATERIALS])
-
-    properties.option_uv_coords = settings.get(
-        constants.UVS,
-        constants.EXPORT_OPTIONS[constants.UVS])
-
-    properties.option_face_materials = settings.get(
-        constants.FACE_MATERIALS,
-        constants.EXPORT_OPTIONS[constants.FACE_MATERIALS])
+    logging.debug("Settings cache found %s", fname)
+    settings = json.loads(payload.decode('utf-8'))
 
-    properties.option_maps = settings.get(
-        constants.MAPS,
-        constants.EXPORT_OPTIONS[constants.MAPS])
+    for key, attr in _SETTINGS_MAP:
+        setattr(properties, attr, settings.get(key, defaults[key]))
 
-    properties.option_colors = settings.get(
-        constants.COLORS,
-        constants.EXPORT_OPTIONS[constants.COLORS])
-
-    properties.option_mix_colors = settings.get(
-        constants.MIX_COLORS,
-        constants.EXPORT_OPTIONS[constants.MIX_COLORS])
-    ## }
-
-    ## Settings {
-    properties.option_scale = settings.get(
-        constants.SCALE,
-        constants.EXPORT_OPTIONS[constants.SCALE])
-
-    properties.option_round_off = settings.get(
-        constants.ENABLE_PRECISION,
-        constants.EXPORT_OPTIONS[constants.ENABLE_PRECISION])
-
-    properties.option_round_value = settings.get(
-        constants.PRECISION,
-        constants.EXPORT_OPTIONS[constants.PRECISION])
-
-    properties.option_logging = settings.get(
-        constants.LOGGING,
-        constants.EXPORT_OPTIONS[constants.LOGGING])
-
-    properties.option_compression = settings.get(
-        constants.COMPRESSION,
-        constants.NONE)
-
-    properties.option_indent = settings.get(
-        constants.INDENT,
-        constants.EXPORT_OPTIONS[constants.INDENT])
-
-    properties.option_copy_textures = settings.get(
-        constants.COPY_TEXTURES,
-        constants.EXPORT_OPTIONS[constants.COPY_TEXTURES])
-
-    properties.option_embed_animation = settings.get(
-        constants.EMBED_ANIMATION,
-        constants.EXPORT_OPTIONS[constants.EMBED_ANIMATION])
-    ## }
-
-    ## Scene {
-    properties.option_export_scene = settings.get(
-        constants.SCENE,
-        constants.EXPORT_OPTIONS[constants.SCENE])
-
-    #properties.option_embed_geometry = settings.get(
-    #    constants.EMBED_GEOMETRY,
-    #    constants.EXPORT_OPTIONS[constants.EMBED_GEOMETRY])
-
-    properties.option_lights = settings.get(
-        constants.LIGHTS,
-        constants.EXPORT_OPTIONS[constants.LIGHTS])
-
-    properties.option_cameras = settings.get(
-        constants.CAMERAS,
-        constants.EXPORT_OPTIONS[constants.CAMERAS])
-    ## }
-
-    ## Animation {
-    properties.option_animation_morph = settings.get(
-        constants.MORPH_TARGETS,
-        constants.EXPORT_OPTIONS[constants.MORPH_TARGETS])
-
-    properties.option_animation_skeletal = settings.get(
-        constants.ANIMATION,
-        constants.EXPORT_OPTIONS[constants.ANIMATION])
-
-    properties.option_frame_step = settings.get(
-        constants.FRAME_STEP,
-        constants.EXPORT_OPTIONS[constants.FRAME_STEP])
-
-    properties.option_frame_index_as_time = settings.get(
-        constants.FRAME_INDEX_AS_TIME,
-        constants.EXPORT_OPTIONS[constants.FRAME_INDEX_AS_TIME])
-    ## }
+# Supported compression formats
+if _HAS_MSGPACK:
+    _COMPRESSION_TYPES = (
+        (constants.NONE, constants.NONE, constants.NONE),
+        (constants.MSGPACK, constants.MSGPACK, constants.MSGPACK))
+else:
+    _COMPRESSION_TYPES = (
+        (constants.NONE, constants.NONE, constants.NONE),)
 
 def compression_types():
     """Supported compression formats
@@ -467,30 +382,45 @@ def compression_types():
     :rtype: tuple
 
     """
-    types = [(constants.NONE, constants.NONE, constants.NONE)]
-
-    try:
-        import msgpack
-        types.append((constants.MSGPACK, constants.MSGPACK,
-                      constants.MSGPACK))
-    except ImportError:
-        pass
-
-    return types
+    return _COMPRESSION_TYPES
+
+# The supported skeletal animation types
+_ANIMATION_OPTIONS = tuple((key, key.title(), key) for key in (
+    constants.OFF,
+    constants.POSE,
+    constants.REST))
+
+# Logging verbosity levels
+_LOGGING_ITEMS = tuple((key, key, key) for key in (
+    constants.DEBUG,
+    constants.INFO,
+    constants.WARNING,
+    constants.ERROR,
+    constants.CRITICAL))
 
 def animation_options():
     """The supported skeletal animation types
 
-    :returns: list of tuples
+    :returns: tuple of tuples
 
     """
-    anim = [
-        (constants.OFF, constants.OFF.title(), constants.OFF),
-        (constants.POSE, constants.POSE.title(), constants.POSE),
-        (constants.REST, constants.REST.title(), constants.REST)
-    ]
+    return _ANIMATION_OPTIONS
+
+_exporter = None
+
+def _get_exporter():
+    """Import the exporter package on first use and cache it
+
+    :returns: the io_three.exporter module
 
-    return anim
+    """
+    global _exporter
+
+    if _exporter is None:
+        from io_three import exporter
+        _exporter = exporter
+
+    return _exporter
 
 class ExportThree(bpy.types.Operator, ExportHelper):
     """Class that handles the export properties"""
@@ -576,23 +506,16 @@ class ExportThree(bpy.types.Operator, ExportHelper):
         description="Floating point precision",
         default=constants.EXPORT_OPTIONS[constants.PRECISION])
 
-    logging_types = [
-        (constants.DEBUG, constants.DEBUG, constants.DEBUG),
-        (constants.INFO, constants.INFO, constants.INFO),
-        (constants.WARNING, constants.WARNING, constants.WARNING),
-        (constants.ERROR, constants.ERROR, constants.ERROR),
-        (constants.CRITICAL, constants.CRITICAL, constants.CRITICAL)]
-
     option_logging = EnumProperty(
         name="",
         description="Logging verbosity level",
-        items=logging_types,
+        items=_LOGGING_ITEMS,
         default=constants.DEBUG)
 
     option_geometry_type = EnumProperty(
         name="Type",
         description="Geometry type",
-        items=_geometry_types()[1:],
+        items=_GEOMETRY_TYPES[1:],
         default=constants.GEOMETRY)
 
     option_export_scene = BoolProperty(
@@ -635,7 +558,7 @@ class ExportThree(bpy.types.Operator, ExportHelper):
     option_animation_skeletal = EnumProperty(
         name="",
         description="Export animation (skeletal)",
-        items=animation_options(),
+        items=_ANIMATION_OPTIONS,
         default=constants.OFF)
 
     option_frame_index_as_time = BoolProperty(
@@ -660,7 +583,7 @@ class ExportThree(bpy.types.Operator, ExportHelper):
     option_compression = EnumProperty(
         name="",
         description="Compression options",
-        items=compression_types(),
+        items=_COMPRESSION_TYPES,
         default=constants.NONE)
 
     option_influences = IntProperty(
@@ -696,9 +619,10 @@ class ExportThree(bpy.types.Operator, ExportHelper):
 
         filepath = self.filepath
         if settings[constants.COMPRESSION] == constants.MSGPACK:
-            filepath = "%s%s" % (filepath[:-4], constants.PACK)
+            filepath = (os.path.splitext(filepath)[0] +
+                        constants.EXTENSIONS[constants.MSGPACK])
 
-        from io_three import exporter
+        exporter = _get_exporter()
         if settings[constants.SCENE]:
             exporter.export_scene(filepath, settings)
         else:
@@ -713,25 +637,26 @@ class ExportThree(bpy.types.Operator, ExportHelper):
 
         """
         layout = self.layout
+        props = self.properties
 
         ## Geometry {
         row = layout.row()
         row.label(text="GEOMETRY:")
 
         row = layout.row()
-        row.prop(self.properties, 'option_vertices')
-        row.prop(self.properties, 'option_faces')
+        row.prop(props, 'option_vertices')
+        row.prop(props, 'option_faces')
 
         row = layout.row()
-        row.prop(self.properties, 'option_normals')
-        row.prop(self.properties, 'option_uv_coords')
+        row.prop(props, 'option_normals')
+        row.prop(props, 'option_uv_coords')
 
         row = layout.row()
-        row.prop(self.properties, 'option_bones')
-        row.prop(self.properties, 'option_skinning')
+        row.prop(props, 'option_bones')
+        row.prop(props, 'option_skinning')
 
         row = layout.row()
-        row.prop(self.properties, 'option_geometry_type')
+        row.prop(props, 'option_geometry_type')
 
         ## }
 
@@ -742,13 +667,11 @@ class ExportThree(bpy.types.Operator, ExportHelper):
         row.label(text="- Shading:")
 
         row = layout.row()
-        row.prop(self.properties, 'option_face_materials')
+        row.prop(props, 'option_face_materials')
 
         row = layout.row()
-        row.prop(self.properties, 'option_colors')
-
-        row = layout.row()
-        row.prop(self.properties, 'option_mix_colors')
+        row.prop(props, 'option_colors')
+        row.prop(props, 'option_mix_colors')
         ## }
 
         layout.separator()
@@ -758,26 +681,19 @@ class ExportThree(bpy.types.Operator, ExportHelper):
         row.label(text="- Animation:")
 
         row = layout.row()
-        row.prop(self.properties, 'option_animation_morph')
+        row.prop(props, 'option_animation_morph')
 
         row = layout.row()
         row.label(text="Skeletal animations:")
+        row.prop(props, 'option_animation_skeletal')
 
         row = layout.row()
-        row.prop(self.properties, 'option_animation_skeletal')
+        row.prop(props, 'option_influences')
+        row.prop(props, 'option_frame_step')
 
-        layout.row()
         row = layout.row()
-        row.prop(self.properties, 'option_influences')
-
-        row = layout.row()
-        row.prop(self.properties, 'option_frame_step')
-
-        row = layout.row()
-        row.prop(self.properties, 'option_frame_index_as_time')
-
-        row = layout.row()
-        row.prop(self.properties, 'option_embed_animation')
+        row.prop(props, 'option_frame_index_as_time')
+        row.prop(props, 'option_embed_animation')
 
         ## }
 
@@ -788,15 +704,15 @@ class ExportThree(bpy.types.Operator, ExportHelper):
         row.label(text="SCENE:")
 
         row = layout.row()
-        row.prop(self.properties, 'option_export_scene')
-        row.prop(self.properties, 'option_materials')
+        row.prop(props, 'option_export_scene')
+        row.prop(props, 'option_materials')
 
         #row = layout.row()
-        #row.prop(self.properties, 'option_embed_geometry')
+        #row.prop(props, 'option_embed_geometry')
 
         row = layout.row()
-        row.prop(self.properties, 'option_lights')
-        row.prop(self.properties, 'option_cameras')
+        row.prop(props, 'option_lights')
+        row.prop(props, 'option_cameras')
         ## }
 
         layout.separator()
@@ -806,35 +722,26 @@ class ExportThree(bpy.types.Operator, ExportHelper):
         row.label(text="SETTINGS:")
 
         row = layout.row()
-        row.prop(self.properties, 'option_maps')
-
-        row = layout.row()
-        row.prop(self.properties, 'option_copy_textures')
+        row.prop(props, 'option_maps')
+        row.prop(props, 'option_copy_textures')
 
         row = layout.row()
-        row.prop(self.properties, 'option_scale')
+        row.prop(props, 'option_scale')
 
-        layout.row()
-        row = layout.row()
-        row.prop(self.properties, 'option_round_off')
         row = layout.row()
-        row.prop(self.properties, 'option_round_value')
+        row.prop(props, 'option_round_off')
+        row.prop(props, 'option_round_value')
 
-        layout.row()
         row = layout.row()
         row.label(text="Logging verbosity:")
-
-        row = layout.row()
-        row.prop(self.properties, 'option_logging')
+        row.prop(props, 'option_logging')
 
         row = layout.row()
         row.label(text="File compression format:")
+        row.prop(props, 'option_compression')
 
         row = layout.row()
-        row.prop(self.properties, 'option_compression')
-
-        row = layout.row()
-        row.prop(self.properties, 'option_indent')
+        row.prop(props, 'option_indent')
         ## }
 
 